@@ -1,21 +1,27 @@
 import json
+import logging
 import math
+import os
 import random
+from array import array
+from functools import lru_cache
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple, Dict
+from typing import Iterator, List, Optional, Set, Tuple, Dict
 from enum import Enum, auto
 
 # --- Data Classes ---
 
-from hex import Pt, HexGrid
+from hex import Pt, HexGrid, hex_distance_table
 
-@dataclass
+log = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
 class Spell:
     name: str
     damage: int
     range: int
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UnitType:
     name: str
     health: int
@@ -23,42 +29,31 @@ class UnitType:
     wc: int
     attack_damage: int
     speed: int
-    spells: List[str]
+    spells: Tuple[str, ...]
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class UnitState:
     state: 'GameState'  # Reference to game state
     uid: int
     current_health: int
+    player_id: int
+    unit_type: UnitType
+    position: Optional[Pt]  # Kept in sync with the grid by GameState; None once dead
 
     def __repr__(self):
         symbol = "♔" if self.player_id == 1 else "♚"
         name_with_id = f"{self.unit_type.name}#{self.uid} {symbol}"
         if not self.is_alive:
             return f"{name_with_id:12} {symbol}: DEAD"
-        pos = self.state.grid.get_pt(self.uid)
-        return f"{name_with_id:12} at {pos}: {self.current_health}/{self.unit_type.health}hp"
+        return f"{name_with_id:12} at {self.position}: {self.current_health}/{self.unit_type.health}hp"
     
     @property
     def is_alive(self):
         return self.current_health > 0
         
-    @property
-    def player_id(self):
-        return 1 if self.uid % 2 != 0 else 2
-        
-    @property
-    def unit_type(self) -> UnitType:
-        return self.state.instance.units[self.uid]
-        
     @property
     def name(self):
         return self.unit_type.name
-    
-    @property
-    def position(self) -> Pt:
-        """Get position from the grid using reverse lookup"""
-        return self.state.grid.get_pt(self.uid)
 
 class MoveType(Enum):
     MOVE = auto()
@@ -71,7 +66,7 @@ class RollResult(Enum):
     HIT = auto()
     CRIT = auto()
 
-@dataclass
+@dataclass(slots=True)
 class GameMove:
     move_type: MoveType
     target_pos: Pt
@@ -88,31 +83,66 @@ class GameMove:
             return f"Cast {self.spell_name} at {self.target_pos}"
         return f"{self.move_type.name} {self.target_pos}"
 
+@dataclass(slots=True, eq=False)
+class UndoRecord:
+    """What GameState.make_move changed, so undo_move can put it back."""
+    attacker: 'UnitState'
+    attacker_pos: Pt
+    target: Optional['UnitState']
+    target_health: int
+    target_pos: Optional[Pt]
+    turn_index: int
+    zobrist: int
+
 # --- Game Configuration ---
 
+# Item tuples rather than dicts, so the cached result can't be changed by callers
+_ConfigData = Tuple[int, int, Tuple[Tuple[str, Spell], ...], Tuple[Tuple[str, UnitType], ...], int]
+
+def _load_config(config_path: str) -> _ConfigData:
+    # Cache by absolute path, so relative paths stay correct after a chdir
+    return _read_config(os.path.abspath(config_path))
+
+# Parsed once per config file and process. Spell and UnitType are frozen, so every
+# GameConfig can share the same instances.
+@lru_cache(maxsize=8)
+def _read_config(config_path: str) -> _ConfigData:
+    with open(config_path, 'r') as f:
+        data = json.load(f)
+
+    spells = tuple((s['name'], Spell(s['name'], s['damage'], s['range'])) for s in data['spells'])
+
+    unit_types = tuple(
+        (u['name'], UnitType(
+            u['name'], u['health'], u['AC'], u['WC'], 
+            u['attack_damage'], u['speed'], tuple(u['spells'])
+        ))
+        for u in data['units']
+    )
+
+    spell_range_slack = data.get('ai', {}).get('spell_range_slack', 2)
+
+    return data['grid']['width'], data['grid']['height'], spells, unit_types, spell_range_slack
+
 class GameConfig:
     def __init__(self, config_path: str = "config.json"):
-        with open(config_path, 'r') as f:
-            data = json.load(f)
-
-        self.grid_width = data['grid']['width']
-        self.grid_height = data['grid']['height']
+        self.grid_width, self.grid_height, spells, unit_types, self.spell_range_slack = _load_config(config_path)
         
-        self.spells: Dict[str, Spell] = {}
-        for s in data['spells']:
-            self.spells[s['name']] = Spell(s['name'], s['damage'], s['range'])
-            
-        self.unit_types: Dict[str, UnitType] = {}
-        for u in data['units']:
-            self.unit_types[u['name']] = UnitType(
-                u['name'], u['health'], u['AC'], u['WC'], 
-                u['attack_damage'], u['speed'], u['spells']
-            )
+        # Each config gets its own dicts, so changing entries on one doesn't leak into others
+        self.spells: Dict[str, Spell] = dict(spells)
+        self.unit_types: Dict[str, UnitType] = dict(unit_types)
 
 class Roll:
+    def __init__(self, seed: Optional[int] = None):
+        # Seeded rolls get a private generator, so replays don't depend on (or disturb)
+        # the global random state. Unseeded rolls share the random module's generator.
+        self._rng = random.Random(seed) if seed is not None else random
+
+    def _d20(self) -> int:
+        return self._rng.randint(1, 20)
 
     def roll(self, bonus: int, difficulty: int) -> RollResult:
-        r = random.randint(1, 20)
+        r = self._d20()
         
         threshold = difficulty - bonus
         if r == 20:
@@ -131,28 +161,67 @@ class Roll:
         return res
 
     def _calculate_probability(self, result: RollResult, threshold: int) -> float:
-        # P(Crit) = 0.05
-        if result == RollResult.CRIT:
-            return 0.05
-            
-        # Count hits in 2..19
-        # r >= threshold
-        # Valid r in [2, 19]
-        # Hits are r in [max(2, threshold), 19]
-        lower = max(2, threshold)
-        upper = 19
+        # Thresholds below 2 or above 20 have the same odds as 2 and 20
+        if threshold < 2:
+            threshold = 2
+        elif threshold > 20:
+            threshold = 20
+        return _PROBABILITY_TABLE[result][threshold]
+
+def _roll_probability(result: RollResult, threshold: int) -> float:
+    # P(Crit) = 0.05
+    if result == RollResult.CRIT:
+        return 0.05
         
-        hits = 0
-        if lower <= upper:
-            hits = upper - lower + 1
-            
-        p_hit = hits / 20.0
+    # Count hits in 2..19
+    # r >= threshold
+    # Valid r in [2, 19]
+    # Hits are r in [max(2, threshold), 19]
+    lower = max(2, threshold)
+    upper = 19
+    
+    hits = 0
+    if lower <= upper:
+        hits = upper - lower + 1
         
-        if result == RollResult.HIT:
-            return p_hit
-            
-        # P(Miss) = 1.0 - P(Crit) - P(Hit)
-        return (19 - hits) / 20.0
+    p_hit = hits / 20.0
+    
+    if result == RollResult.HIT:
+        return p_hit
+        
+    # P(Miss) = 1.0 - P(Crit) - P(Hit)
+    return (19 - hits) / 20.0
+
+# RollResult -> probability indexed by threshold, for thresholds 0..20
+_PROBABILITY_TABLE: Dict[RollResult, Tuple[float, ...]] = {
+    res: tuple(_roll_probability(res, t) for t in range(21)) for res in RollResult
+}
+
+_D20_FACES = range(1, 21)
+
+class BatchedRoll(Roll):
+    """Roll that deals d20 results from a pre-generated pool, refilled in batches.
+
+    Meant for long simulations where a fresh randint per roll adds up.
+    Pass a seed for a reproducible sequence of rolls.
+    """
+    POOL_SIZE = 4096
+
+    def __init__(self, seed: Optional[int] = None):
+        super().__init__(seed)
+        self._refill()
+
+    def _refill(self):
+        self._pool = self._rng.choices(_D20_FACES, k=self.POOL_SIZE)
+        self._pool_idx = 0
+
+    def _d20(self) -> int:
+        i = self._pool_idx
+        if i == self.POOL_SIZE:
+            self._refill()
+            i = 0
+        self._pool_idx = i + 1
+        return self._pool[i]
 
 class FixedRoll(Roll):
     def __init__(self, result: RollResult):
@@ -163,6 +232,16 @@ class FixedRoll(Roll):
         self.last_probability = self._calculate_probability(self.fixed_result, difficulty - bonus)
         return self.fixed_result
 
+def _threat(unit_type: UnitType, spells: Dict[str, Spell]) -> int:
+    """The most damage a unit can deal in one action, by weapon or by any known spell."""
+    return max([unit_type.attack_damage] + [spells[s].damage for s in unit_type.spells if s in spells])
+
+# Most move lists GameState.get_possible_moves keeps before starting over
+_MOVE_CACHE_SIZE = 100_000
+
+# Seed for the Zobrist hashing keys drawn by GameState
+_ZOBRIST_SEED = 0x6D61
+
 # --- Game Instance ---
 
 class GameInstance:
@@ -171,7 +250,9 @@ class GameInstance:
         self.turn_order: List[int] = []
         self.units: Dict[int, UnitType] = {} # unit_uid -> UnitType
 
-    def start_game(self, p1_units: List[str], p2_units: List[str]) -> 'GameState':
+    def start_game(self, p1_units: List[str], p2_units: List[str],
+                   rng: Optional[random.Random] = None) -> 'GameState':
+        """Places both armies and shuffles the turn order, with rng if given."""
         grid = HexGrid(self.config.grid_width, self.config.grid_height)
 
         # Player 1 (Top)
@@ -205,8 +286,8 @@ class GameInstance:
             uid += 2
 
         self.turn_order = list(self.units.keys())
-        random.shuffle(self.turn_order)
-        print(f"Game Initialized. Turn Order: {self.turn_order}")
+        (rng or random).shuffle(self.turn_order)
+        log.debug("Game Initialized. Turn Order: %s", self.turn_order)
         return GameState(self, grid)
 
 class GameState:
@@ -218,15 +299,68 @@ class GameState:
         # Create UnitState for each unit in the grid
         for pos, uid in grid.items():
             unit_type = instance.units[uid]
-            self.units[uid] = UnitState(self, uid, unit_type.health)
+            self.units[uid] = UnitState(self, uid, unit_type.health, 1 if uid % 2 != 0 else 2, unit_type, pos)
+            
+        # Combat stats read on every action, packed into small-int arrays indexed by uid.
+        # Unit types never change during a game, so clones share these.
+        unit_types = [instance.units.get(uid) for uid in range(max(instance.units, default=0) + 1)]
+        self._ac = array('h', (t.ac if t else 0 for t in unit_types))
+        self._wc = array('h', (t.wc if t else 0 for t in unit_types))
+        self._attack_damage = array('h', (t.attack_damage if t else 0 for t in unit_types))
+        self._speed = array('h', (t.speed if t else 0 for t in unit_types))
+        spells = instance.config.spells
+        self._threat = array('h', (_threat(t, spells) if t else 0 for t in unit_types))
+
+        # uids of each player's living units, kept up to date as units die
+        self._alive: Dict[int, Set[int]] = {1: set(), 2: set()}
+        for uid, u in self.units.items():
+            if u.current_health > 0:
+                self._alive[u.player_id].add(uid)
             
         self.current_turn_index = 0
 
+        # Turn order as a circular doubly linked list over living units: _next_index[i]
+        # and _prev_index[i] are the turn_order indices of the living units after and
+        # before index i.
+        turn_order = instance.turn_order
+        self._turn_index_of: Dict[int, int] = {uid: i for i, uid in enumerate(turn_order)}
+        n = len(turn_order)
+        is_alive = [uid in self.units and self.units[uid].current_health > 0 for uid in turn_order]
+        self._next_index: List[int] = list(range(n))
+        self._prev_index: List[int] = list(range(n))
+        for i in range(n):
+            j = (i + 1) % n
+            while j != i and not is_alive[j]:
+                j = (j + 1) % n
+            self._next_index[i] = j
+            if is_alive[i]:
+                self._prev_index[j] = i
+
+        # Distance between any two cells, shared by every state on a board of this size
+        self._dist_table = hex_distance_table(grid.width, grid.height)
+        self._num_cells = grid.width * grid.height
+
+        # Zobrist keys: one random key per (uid, cell), (uid, health) and turn index.
+        # The state's hash is the XOR of the keys for its turn and its living units,
+        # updated as they change. Drawn from a fixed seed, so equal setups hash alike;
+        # 63 bits, so __hash__ can return the XOR as is. Shared by clones.
+        rng = random.Random(_ZOBRIST_SEED)
+        cells = grid.width * grid.height
+        self._z_cell = [[rng.getrandbits(63) for _ in range(cells)] if t else [] for t in unit_types]
+        self._z_health = [[rng.getrandbits(63) for _ in range(t.health + 1)] if t else [] for t in unit_types]
+        self._z_turn = [rng.getrandbits(63) for _ in turn_order]
+        self._zobrist = self._z_turn[0] if turn_order else 0
+        for uid, u in self.units.items():
+            if u.current_health > 0:
+                self._zobrist ^= (self._z_cell[uid][u.position.y * grid.width + u.position.x]
+                                  ^ self._z_health[uid][u.current_health])
+        # Zobrist key -> moves from that position, shared with clones
+        self._move_cache: Dict[int, Tuple[GameMove, ...]] = {}
+
     def print(self):
-        alive_units = [u for u in self.units.values() if u.is_alive]
-        sorted_units = sorted(alive_units, key=lambda u: (u.position.y, u.position.x))
-        for unit in sorted_units:
-            print(unit)
+        # The grid holds exactly the alive units, already in row-major order
+        for _, uid in self.grid.occupied():
+            print(self.units[uid])
 
     def get_current_unit(self) -> UnitState:
         uid = self.instance.turn_order[self.current_turn_index]
@@ -237,11 +371,46 @@ class GameState:
         new_state.instance = self.instance
         # Clone the HexGrid
         new_state.grid = self.grid.clone()
-        new_state.units = {uid: UnitState(new_state, uid, u.current_health) for uid, u in self.units.items()}
+        new_state.units = {uid: UnitState(new_state, uid, u.current_health, u.player_id, u.unit_type, u.position) for uid, u in self.units.items()}
+        new_state._ac = self._ac
+        new_state._wc = self._wc
+        new_state._attack_damage = self._attack_damage
+        new_state._speed = self._speed
+        new_state._threat = self._threat
+        new_state._alive = {1: self._alive[1].copy(), 2: self._alive[2].copy()}
         new_state.current_turn_index = self.current_turn_index
+        new_state._turn_index_of = self._turn_index_of
+        new_state._next_index = self._next_index.copy()
+        new_state._prev_index = self._prev_index.copy()
+        new_state._dist_table = self._dist_table
+        new_state._num_cells = self._num_cells
+        new_state._z_cell = self._z_cell
+        new_state._z_health = self._z_health
+        new_state._z_turn = self._z_turn
+        new_state._zobrist = self._zobrist
+        new_state._move_cache = self._move_cache
         return new_state
 
+    def _distance(self, uid1: int, uid2: int) -> int:
+        """Grid distance between two units, read from the board's distance table."""
+        p1 = self.units[uid1].position
+        p2 = self.units[uid2].position
+        width = self.grid.width
+        return self._dist_table[(p1.y * width + p1.x) * self._num_cells + p2.y * width + p2.x]
+
     def get_possible_moves(self) -> List[GameMove]:
+        # Moves depend only on unit cells and whose turn it is, which the Zobrist key
+        # covers, so states reached again through another move order reuse the list.
+        key = self._zobrist
+        cached = self._move_cache.get(key)
+        if cached is None:
+            if len(self._move_cache) >= _MOVE_CACHE_SIZE:
+                self._move_cache.clear()
+            cached = self._move_cache[key] = tuple(self._generate_moves())
+        # Callers may reorder the list they get
+        return list(cached)
+
+    def _generate_moves(self) -> List[GameMove]:
         moves = []
         
         # The current turn system enforces turn order. 
@@ -252,82 +421,92 @@ class GameState:
         u = current_unit
         player_id = u.player_id
         
-        # 1. Move - only towards enemies that are not already adjacent
-        enemies = [e for e in self.units.values() if e.player_id != player_id and e.is_alive]
-        
-        for enemy in enemies:
-            # Skip if already adjacent (can attack instead)
-            if self.grid.distance(u.position, enemy.position) <= 1:
+        # Living enemies paired with their distance to u, computed in a single pass
+        # and shared by every move class below.
+        units = self.units
+        u_uid = u.uid
+        distance = self._distance
+        enemies = [(units[uid], distance(u_uid, uid)) for uid in self._alive[3 - player_id]]
+
+        grid = self.grid
+        # One flood from u's cell answers every find_path_adj query below
+        paths = grid.path_tree(u.position)
+        speed = self._speed[u_uid]
+        # Moves go up to speed * 2 cells along the path
+        max_dist = speed * 2
+
+        # Moves, attacks and charges come from a single pass over the enemies, with
+        # one path per enemy, but are listed by kind: moves, then attacks, then charges.
+        attacks = []
+        charges = []
+        for e, dist in enemies:
+            # 2. Attack - enemies already adjacent. Neither moving towards them nor
+            # charging them can get any closer, so no path is needed.
+            if dist <= 1:
+                attacks.append(GameMove(MoveType.ATTACK, target_pos=e.position))
                 continue
-                
+
             # Find path to adjacent cell of enemy
-            path = self.grid.find_path_adj(u.position, enemy.position)
-            
-            if path and len(path) > 1:  # path includes start position
-                # Generate moves along the path up to speed * 2
-                max_dist = u.unit_type.speed * 2
-                # path[0] is start, so we want path[min(max_dist, len(path) - 1)]
-                target_index = min(max_dist, len(path) - 1)
-                target_pos = path[target_index]
-                # Only add move if target position is not occupied by another unit
-                if self.grid[target_pos] is None or self.grid[target_pos] == u.uid:
-                    moves.append(GameMove(MoveType.MOVE, target_pos=target_pos))
-                    
-        # 2. Attack
-        # Find all enemies in range
-        enemies = [e for e in self.units.values() if e.player_id != player_id and e.is_alive]
-        for e in enemies:
-            dist = self.grid.distance(u.position, e.position)
-            if dist <= 1:
-                moves.append(GameMove(MoveType.ATTACK, target_pos=e.position))
-                
-        # 3. Charge
-        # Move + Attack. Target must be reachable with speed (not 2x) and then adjacent.
-        # We can iterate enemies and check if we can charge them.
-        for e in enemies:
-            path = self.grid.find_path_adj(u.position, e.position)
+            path = paths.path_adj(e.position)
+            if not path or len(path) <= 1:  # path includes start position
+                continue
+
+            # 1. Move - towards enemies that are not already adjacent
+            # path[0] is start, so we want path[min(max_dist, len(path) - 1)]
+            target_index = min(max_dist, len(path) - 1)
+            target_pos = path[target_index]
+            # Only add move if target position is not occupied by another unit
+            if grid.is_free(target_pos, u_uid):
+                moves.append(GameMove(MoveType.MOVE, target_pos=target_pos))
+
+            # 3. Charge
+            # Move + Attack. Target must be reachable with speed (not 2x) and then adjacent.
             # path includes start position, so len(path)-1 is the number of steps
-            if path and len(path) > 1 and len(path) - 1 <= u.unit_type.speed:
+            if len(path) - 1 <= speed:
                 # Use the last position in the path (adjacent to enemy)
                 charge_pos = path[-1]
                 # Verify the charge position is adjacent to enemy
-                if self.grid.distance(charge_pos, e.position) == 1:
-                    moves.append(GameMove(MoveType.CHARGE, target_pos=e.position))
+                if grid.within_one(charge_pos, e.position):
+                    charges.append(GameMove(MoveType.CHARGE, target_pos=e.position))
+        moves += attacks
+        moves += charges
                 
         # 4. Spells
+        config = self.instance.config
+        spells = config.spells
+        slack = config.spell_range_slack
         for spell_name in u.unit_type.spells:
-            spell = self.instance.config.spells[spell_name]
-            # Spells usually have range.
-            for e in enemies:
-                dist = self.grid.distance(u.position, e.position)
-                # Check if in range? The cast_spell logic calculates difficulty based on range, 
-                # but doesn't strictly forbid out of range (just harder).
-                # But maybe we should limit to reasonable range?
-                # For now, let's allow all enemies as targets.
-                moves.append(GameMove(MoveType.CAST_SPELL, target_pos=e.position, spell_name=spell_name))
+            # Casting past a spell's range is allowed but gets 4 points harder per extra
+            # hex. As a search heuristic, only enemies within spell_range_slack hexes past
+            # the range are considered as targets.
+            max_target_dist = spells[spell_name].range + slack
+            for e, dist in enemies:
+                if dist <= max_target_dist:
+                    moves.append(GameMove(MoveType.CAST_SPELL, target_pos=e.position, spell_name=spell_name))
                 
         return moves
 
     def _next_turn(self):
-        # Skip dead units
-        original_index = self.current_turn_index
-        while True:
-            self.current_turn_index = (self.current_turn_index + 1) % len(self.instance.turn_order)
-            uid = self.instance.turn_order[self.current_turn_index]
-            if self.units[uid].is_alive:
-                break
-            if self.current_turn_index == original_index:
-                # All units dead? Should be handled by game over check
-                break
+        # Dead units are unlinked from _next_index, so no skipping is needed
+        old_index = self.current_turn_index
+        self.current_turn_index = self._next_index[old_index]
+        self._zobrist ^= self._z_turn[old_index] ^ self._z_turn[self.current_turn_index]
+
+    def _unlink_from_turn_order(self, uid: int):
+        """Splice a dead unit out of the living-units turn ring."""
+        dead = self._turn_index_of[uid]
+        successor = self._next_index[dead]
+        predecessor = self._prev_index[dead]
+        self._next_index[predecessor] = successor
+        self._prev_index[successor] = predecessor
 
     def is_valid_move(self, unit: UnitState, target_pos: Pt, max_dist: int) -> bool:
-        if not self.grid.is_in_bounds(target_pos):
-            return False
-        target_uid = self.grid[target_pos]
-        if target_uid is not None and target_uid != unit.uid:
-            return False  # Occupied by another unit
+        if not self.grid.is_free(target_pos, unit.uid):
+            return False  # Off the board or occupied by another unit
         
-        dist = self.grid.distance(unit.position, target_pos)
+        pos = unit.position
+        width = self.grid.width
+        dist = self._dist_table[(pos.y * width + pos.x) * self._num_cells + target_pos.y * width + target_pos.x]
         return dist <= max_dist
 
     def execute_move(self, move: GameMove, roll: 'Roll'):
@@ -335,97 +514,124 @@ class GameState:
         if not attacker:
             raise ValueError("No active unit for turn.")
 
-        if move.move_type == MoveType.MOVE:
-            self._move(attacker, move.target_pos)
-        elif move.move_type == MoveType.ATTACK:
-            # For other moves, target_pos must contain a unit
-            target_uid = self.grid[move.target_pos]
-            if target_uid is None:
-                raise ValueError(f"No unit at target position {move.target_pos}")
-            target = self.units[target_uid]
-            self._attack(attacker, target, roll)
-        elif move.move_type == MoveType.CHARGE:
-            # For other moves, target_pos must contain a unit
-            target_uid = self.grid[move.target_pos]
-            if target_uid is None:
-                raise ValueError(f"No unit at target position {move.target_pos}")
-            target = self.units[target_uid]
-            # Find best charge position using pathfinding
-            path = self.grid.find_path_adj(attacker.position, target.position)
-            # path includes start position, so len(path)-1 is the number of steps
-            if not path or len(path) <= 1:
-                raise ValueError("No valid charge position found.")
-            if len(path) - 1 > attacker.unit_type.speed:
-                raise ValueError(f"Target too far for charge (distance: {len(path)-1}, speed: {attacker.unit_type.speed})")
-            # Use the last position in the path (adjacent to target)
-            best_pos = path[-1]
-            self._charge(attacker, best_pos, target, roll)
-        elif move.move_type == MoveType.CAST_SPELL:
-            # For other moves, target_pos must contain a unit
-            target_uid = self.grid[move.target_pos]
-            if target_uid is None:
-                raise ValueError(f"No unit at target position {move.target_pos}")
-            target = self.units[target_uid]
-            if not move.spell_name:
-                raise ValueError("Spell name required for CAST_SPELL move.")
-            self._cast_spell(attacker, move.spell_name, target, roll)
-        else:
-            raise ValueError("Unhandled move_type: " + str(move.move_type))
+        try:
+            handler = self._MOVE_HANDLERS[move.move_type]
+        except KeyError:
+            raise ValueError("Unhandled move_type: " + str(move.move_type)) from None
+        handler(self, attacker, move, roll)
         
         # Advance to next turn after executing move
         self._next_turn()
 
-
+    def _target_at(self, pos: Pt) -> UnitState:
+        # For all moves but MOVE, target_pos must contain a unit
+        target_uid = self.grid[pos]
+        if target_uid is None:
+            raise ValueError(f"No unit at target position {pos}")
+        return self.units[target_uid]
+
+    def _handle_move(self, attacker: UnitState, move: GameMove, roll: 'Roll'):
+        self._move(attacker, move.target_pos)
+
+    def _handle_attack(self, attacker: UnitState, move: GameMove, roll: 'Roll'):
+        self._attack(attacker, self._target_at(move.target_pos), roll)
+
+    def _handle_charge(self, attacker: UnitState, move: GameMove, roll: 'Roll'):
+        target = self._target_at(move.target_pos)
+        # Find best charge position using pathfinding
+        path = self.grid.find_path_adj(attacker.position, target.position)
+        # path includes start position, so len(path)-1 is the number of steps
+        if not path or len(path) <= 1:
+            raise ValueError("No valid charge position found.")
+        speed = self._speed[attacker.uid]
+        if len(path) - 1 > speed:
+            raise ValueError(f"Target too far for charge (distance: {len(path)-1}, speed: {speed})")
+        # Use the last position in the path (adjacent to target)
+        best_pos = path[-1]
+        self._charge(attacker, best_pos, target, roll)
+
+    def _handle_cast_spell(self, attacker: UnitState, move: GameMove, roll: 'Roll'):
+        target = self._target_at(move.target_pos)
+        if not move.spell_name:
+            raise ValueError("Spell name required for CAST_SPELL move.")
+        self._cast_spell(attacker, move.spell_name, target, roll)
+
+    # Jump table used by execute_move, built once for the class
+    _MOVE_HANDLERS = {
+        MoveType.MOVE: _handle_move,
+        MoveType.ATTACK: _handle_attack,
+        MoveType.CHARGE: _handle_charge,
+        MoveType.CAST_SPELL: _handle_cast_spell,
+    }
 
     def _apply_damage(self, base_damage: int, target: UnitState, rr: RollResult):
         """Apply damage based on roll result and remove unit if dead."""
+        if target.current_health <= 0:
+            return
+        if rr == RollResult.MISS:
+            return
+        z_health = self._z_health[target.uid]
+        self._zobrist ^= z_health[target.current_health]
         if rr == RollResult.CRIT:
             target.current_health -= base_damage * 2
-        elif rr == RollResult.HIT:
+        else:
             target.current_health -= base_damage
         
-        if not target.is_alive:
-            target_pos = self.grid.get_pt(target.uid)
-            del self.grid[target_pos]
+        if target.current_health > 0:
+            self._zobrist ^= z_health[target.current_health]
+        else:
+            pos = target.position
+            self._zobrist ^= self._z_cell[target.uid][pos.y * self.grid.width + pos.x]
+            del self.grid[pos]
+            target.position = None
+            self._unlink_from_turn_order(target.uid)
+            self._alive[target.player_id].discard(target.uid)
 
     def _move(self, unit: UnitState, target_pos: Pt):
-        if not self.is_valid_move(unit, target_pos, unit.unit_type.speed * 2):
+        if not self.is_valid_move(unit, target_pos, self._speed[unit.uid] * 2):
             raise ValueError(f"Invalid move for {unit} to {target_pos}")
         
-        old_pos = self.grid.get_pt(unit.uid)
-        del self.grid[old_pos]
-        self.grid[target_pos] = unit.uid
+        self._relocate(unit, target_pos)
 
     def _charge(self, attacker: UnitState, move_target_pos: Pt, attack_target: UnitState, roll: 'Roll'):
         # Charge: Move up to Speed (not 2x Speed) then Attack with -4 WC
-        if not self.is_valid_move(attacker, move_target_pos, attacker.unit_type.speed):
+        if not self.is_valid_move(attacker, move_target_pos, self._speed[attacker.uid]):
              raise ValueError(f"Invalid charge move for {attacker.name} to {move_target_pos}")
         
         # Execute move
-        old_pos = self.grid.get_pt(attacker.uid)
-        del self.grid[old_pos]
-        self.grid[move_target_pos] = attacker.uid
+        self._relocate(attacker, move_target_pos)
         
         # Execute attack
         self._attack(attacker, attack_target, roll, penalty_wc=4)
 
+    def _relocate(self, unit: UnitState, target_pos: Pt):
+        """Moves unit to target_pos, which the caller has checked is free."""
+        old_pos = unit.position
+        del self.grid[old_pos]
+        self.grid[target_pos] = unit.uid
+        unit.position = target_pos
+        width = self.grid.width
+        z_cell = self._z_cell[unit.uid]
+        self._zobrist ^= z_cell[old_pos.y * width + old_pos.x] ^ z_cell[target_pos.y * width + target_pos.x]
+
     def _attack(self, attacker: UnitState, target: UnitState, roll: 'Roll', penalty_wc: int = 0):
-        dist = self.grid.distance(attacker.position, target.position)
-        if dist > 1:
+        if not self.grid.within_one(attacker.position, target.position):
+            dist = self._distance(attacker.uid, target.uid)
             raise ValueError(f"Target out of range for attack (dist: {dist})")
         
-        bonus = attacker.unit_type.wc - penalty_wc
-        difficulty = target.unit_type.ac
+        bonus = self._wc[attacker.uid] - penalty_wc
+        difficulty = self._ac[target.uid]
         res = roll.roll(bonus, difficulty)
         
-        self._apply_damage(attacker.unit_type.attack_damage, target, res)
+        self._apply_damage(self._attack_damage[attacker.uid], target, res)
 
     def _cast_spell(self, attacker: UnitState, spell_name: str, target: UnitState, roll: 'Roll'):
-        if spell_name not in attacker.unit_type.spells:
-            raise ValueError(f"{attacker.name} does not know spell {spell_name}")
+        unit_type = attacker.unit_type
+        if spell_name not in unit_type.spells:
+            raise ValueError(f"{unit_type.name} does not know spell {spell_name}")
         
         spell = self.instance.config.spells[spell_name]
-        dist = self.grid.distance(attacker.position, target.position)
+        dist = self._distance(attacker.uid, target.uid)
         
         difficulty = dist if dist <= spell.range else dist + (dist - spell.range) * 4
         res = roll.roll(0, difficulty)
@@ -435,40 +641,107 @@ class GameState:
     # --- Minimax Protocol Implementation ---
 
     def is_over(self) -> bool:
-        p1_alive = any(u.is_alive for u in self.units.values() if u.player_id == 1)
-        p2_alive = any(u.is_alive for u in self.units.values() if u.player_id == 2)
-        return not p1_alive or not p2_alive
-
-    def apply(self, move: GameMove) -> List[Tuple['GameState', float]]:
+        alive = self._alive
+        return not alive[1] or not alive[2]
+
+    def winner(self) -> Optional[int]:
+        """The player with units left once the game is over, None while it is running."""
+        alive = self._alive
+        if not alive[2]:
+            return 1
+        if not alive[1]:
+            return 2
+        return None
+
+    def apply(self, move: GameMove) -> Iterator[Tuple['GameState', float]]:
+        """Yields each outcome of move by playing it on this state in place.
+
+        Every yielded state is this same object, and the move is undone as soon as the
+        caller asks for the next outcome: use each state before advancing, or clone() it.
+        """
         if move.move_type == MoveType.MOVE:
-            new_state = self.clone()
-            new_state.execute_move(move, FixedRoll(RollResult.HIT))
-            return [(new_state, 1.0)]
+            # Deterministic and touches no other unit: skip the roll and the dispatch
+            # in execute_move, and journal only the mover.
+            unit = self.get_current_unit()
+            record = UndoRecord(unit, unit.position, None, 0, None,
+                                self.current_turn_index, self._zobrist)
+            self._move(unit, move.target_pos)
+            self._next_turn()
+            try:
+                yield self, 1.0
+            finally:
+                # Also runs if the caller closes the generator early
+                self.undo_move(record)
+            return
             
-        outcomes = []
+        total = 0.0
         for res in RollResult:
             fr = FixedRoll(res)
-            new_state = self.clone()
+            record = None
             try:
-                new_state.execute_move(move, fr)
+                record = self.make_move(move, fr)
                 prob = fr.last_probability
                 if prob > 0:
-                    outcomes.append((new_state, prob))
+                    total += prob
+                    yield self, prob
             except ValueError:
                 pass
-        assert sum(prob for _, prob in outcomes) == 1.0, "Probabilities do not sum to 1."
-        return outcomes
+            finally:
+                if record is not None:
+                    self.undo_move(record)
+        # Outcome odds are multiples of 1/20, so the sum can be off by rounding
+        assert abs(total - 1.0) < 1e-9, "Probabilities do not sum to 1."
+
+    def make_move(self, move: GameMove, roll: 'Roll') -> UndoRecord:
+        """execute_move, journaling just enough to reverse it with undo_move.
+
+        Moves must be undone in the reverse order they were made. If execute_move
+        raises, the state is left as it was.
+        """
+        attacker = self.get_current_unit()
+        target_uid = self.grid[move.target_pos]
+        target = self.units[target_uid] if target_uid is not None else None
+        record = UndoRecord(
+            attacker, attacker.position,
+            target, target.current_health if target else 0, target.position if target else None,
+            self.current_turn_index, self._zobrist,
+        )
+        try:
+            self.execute_move(move, roll)
+        except ValueError:
+            self.undo_move(record)
+            raise
+        return record
+
+    def undo_move(self, record: UndoRecord):
+        """Reverses the make_move that returned record."""
+        attacker = record.attacker
+        if attacker.position != record.attacker_pos:
+            del self.grid[attacker.position]
+            self.grid[record.attacker_pos] = attacker.uid
+            attacker.position = record.attacker_pos
+
+        target = record.target
+        if target is not None:
+            if target.current_health <= 0 < record.target_health:
+                # Put the unit back on the board and into the turn ring. Its own ring
+                # links were left untouched when it was unlinked.
+                self.grid[record.target_pos] = target.uid
+                target.position = record.target_pos
+                i = self._turn_index_of[target.uid]
+                self._next_index[self._prev_index[i]] = i
+                self._prev_index[self._next_index[i]] = i
+                self._alive[target.player_id].add(target.uid)
+            target.current_health = record.target_health
+
+        self.current_turn_index = record.turn_index
+        self._zobrist = record.zobrist
 
     def __hash__(self) -> int:
-        # Hash based on unit states and turn index
-        unit_data: List[Tuple] = []
-        for uid in sorted(self.units.keys()):
-            u = self.units[uid]
-            if u.is_alive:
-                unit_data.append((uid, u.position.x, u.position.y, u.current_health))
-            else:
-                unit_data.append((uid, "DEAD"))
-        return hash((self.current_turn_index, tuple(unit_data)))
+        # Zobrist hash of the turn index and every living unit's cell and health,
+        # kept up to date by the methods that change them. Edits made directly on
+        # units (as tests do for setup) are not reflected.
+        return self._zobrist
 
 def heuristic_evaluate(state: GameState) -> float:
     """
@@ -477,27 +750,8 @@ def heuristic_evaluate(state: GameState) -> float:
     Score = Sum(Unit Health * Threat Score)
     Threat Score = Max(Attack Damage, Max Spell Damage)
     """
-    p1_score = 0
-    p2_score = 0
-    
-    for u in state.units.values():
-        if not u.is_alive:
-            continue
-            
-        # Calculate threat score
-        max_spell_dmg = 0
-        if u.unit_type.spells:
-            for s_name in u.unit_type.spells:
-                if s_name in state.instance.config.spells:
-                    s = state.instance.config.spells[s_name]
-                    max_spell_dmg = max(max_spell_dmg, s.damage)
-        
-        threat = max(u.unit_type.attack_damage, max_spell_dmg)
-        unit_score = u.current_health * threat
-        
-        if u.player_id == 1:
-            p1_score += unit_score
-        else:
-            p2_score += unit_score
-            
+    units = state.units
+    threat = state._threat
+    p1_score = sum(units[uid].current_health * threat[uid] for uid in state._alive[1])
+    p2_score = sum(units[uid].current_health * threat[uid] for uid in state._alive[2])
     return float(p1_score - p2_score)
@@ -1,9 +1,7 @@
-from dataclasses import dataclass, field
-from typing import Optional, Any, Dict, Tuple, List
-import heapq
+from typing import Optional, Any, Dict, Tuple, List, NamedTuple, Set
+from functools import lru_cache
 
-@dataclass(frozen=True)
-class Pt:
+class Pt(NamedTuple):
     x: int
     y: int
 
@@ -13,18 +11,89 @@ class Pt:
     def __str__(self) -> str:
         return f"({self.x}, {self.y})"
 
+def hex_distance(x1: int, y1: int, x2: int, y2: int) -> int:
+    """Distance between two odd-r offset cells given as plain ints."""
+    # Convert to cube coordinates inline (see HexGrid._to_cube); r is just y.
+    dq = (x1 - ((y1 - (y1 & 1)) >> 1)) - (x2 - ((y2 - (y2 & 1)) >> 1))
+    dr = y1 - y2
+    # Cube distance is max(|dq|, |dr|, |ds|) with ds = -(dq + dr). When dq and dr
+    # share a sign, |ds| is the largest; otherwise it is the smaller of the two.
+    if (dq ^ dr) >= 0:
+        ds = dq + dr
+        return ds if ds >= 0 else -ds
+    if dq < 0:
+        dq = -dq
+    if dr < 0:
+        dr = -dr
+    return dq if dq > dr else dr
+
+def hex_within_one(x1: int, y1: int, x2: int, y2: int) -> bool:
+    """True if the cells are the same or neighbors, i.e. hex_distance(...) <= 1."""
+    dx = x2 - x1
+    dy = y2 - y1
+    if dy == 0:
+        return -1 <= dx <= 1
+    if dy != 1 and dy != -1:
+        return False
+    # Diagonal neighbors lean right on odd rows and left on even rows (odd-r)
+    if y1 & 1:
+        return dx == 0 or dx == 1
+    return dx == 0 or dx == -1
+
+# (dx, dy) neighbor offsets for odd-r offset coordinates, by row parity.
+_EVEN_ROW_OFFSETS = ((-1, 0), (1, 0), (-1, -1), (0, -1), (-1, 1), (0, 1))
+_ODD_ROW_OFFSETS = ((-1, 0), (1, 0), (0, -1), (1, -1), (0, 1), (1, 1))
+
+@lru_cache(maxsize=None)
+def _grid_points(width: int, height: int) -> Tuple['Pt', ...]:
+    """All cells of a width x height board as interned Pts, in row-major order."""
+    return tuple(Pt(x, y) for y in range(height) for x in range(width))
+
+@lru_cache(maxsize=None)
+def hex_distance_table(width: int, height: int) -> Tuple[int, ...]:
+    """hex_distance between every pair of cells of a width x height board.
+
+    The distance between cell indices a and b (each y * width + x) is at
+    index a * (width * height) + b.
+    """
+    cells = [(i % width, i // width) for i in range(width * height)]
+    return tuple(hex_distance(x1, y1, x2, y2) for x1, y1 in cells for x2, y2 in cells)
+
+@lru_cache(maxsize=None)
+def _neighbor_indices(width: int, height: int) -> Tuple[Tuple[int, ...], ...]:
+    """For each cell index (y * width + x), the indices of its on-board neighbors.
+
+    Neighbors are listed in the same order as the offset tables, with bounds
+    already applied, so pathfinding can expand a cell with a single lookup.
+    """
+    table = []
+    for y in range(height):
+        offsets = _ODD_ROW_OFFSETS if y & 1 else _EVEN_ROW_OFFSETS
+        for x in range(width):
+            table.append(tuple(
+                (y + dy) * width + (x + dx)
+                for dx, dy in offsets
+                if 0 <= x + dx < width and 0 <= y + dy < height
+            ))
+    return tuple(table)
+
 class SquareGrid:
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
 
     def distance(self, p1: Pt, p2: Pt) -> int:
-        dx = abs(p1.x - p2.x)
-        dy = abs(p1.y - p2.y)
-        diag = min(dx, dy)
-        straight = max(dx, dy) - diag
-        # 1 for straight, 1.5 for diagonal (floor(1.5 * diag) = diag + diag//2)
-        return straight + diag + (diag // 2)
+        dx = p1.x - p2.x
+        if dx < 0:
+            dx = -dx
+        dy = p1.y - p2.y
+        if dy < 0:
+            dy = -dy
+        # 1 for straight, 1.5 for diagonal (floor(1.5 * diag) = diag + diag//2),
+        # i.e. straight + diag + diag//2 == max(dx, dy) + min(dx, dy)//2.
+        if dx > dy:
+            return dx + (dy >> 1)
+        return dy + (dx >> 1)
 
 class HexGrid:
     """Hex grid for game board, using odd-r offset coordinates, as per 
@@ -33,34 +102,42 @@ class HexGrid:
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-        self._grid: Dict[Pt, int] = {}
+        # Row-major flat storage: cell (x, y) lives at index y * width + x.
+        self._cells: List[Optional[int]] = [None] * (width * height)
         self._reverse_grid: Dict[int, Pt] = {}
+        # Shared Pt for every cell, indexed like _cells, so hot paths don't allocate Pts
+        self._pts = _grid_points(width, height)
+        self._adj = _neighbor_indices(width, height)
 
     def clone(self) -> 'HexGrid':
-        new_grid = HexGrid(self.width, self.height)
-        new_grid._grid = self._grid.copy()
+        new_grid = HexGrid.__new__(HexGrid)
+        new_grid.width = self.width
+        new_grid.height = self.height
+        new_grid._cells = self._cells.copy()
         new_grid._reverse_grid = self._reverse_grid.copy()
+        new_grid._pts = self._pts
+        new_grid._adj = self._adj
         return new_grid
 
     def items(self):
         """Returns a list of (Pt, oid) tuples, similar to dict.items()."""
-        return self._grid.items()
+        return [(pt, oid) for oid, pt in self._reverse_grid.items()]
+
+    def occupied(self) -> List[Tuple[Pt, int]]:
+        """Returns (Pt, oid) for every occupied cell, in row-major (y, x) order."""
+        pts = self._pts
+        return [(pts[i], oid) for i, oid in enumerate(self._cells) if oid is not None]
 
     def is_in_bounds(self, pt: Pt) -> bool:
         """Returns True if the point is within the grid boundaries."""
         return 0 <= pt.x < self.width and 0 <= pt.y < self.height
 
     def __repr__(self) -> str:
-        if not self._grid:
+        if not self._reverse_grid:
             return "HexGrid({})"
-        # Sort by (y, x) for row-major order
-        sorted_items = sorted(self.items(), key=lambda item: (item[0].y, item[0].x))
-        items_str = ", ".join(f"{str(pt)}: {oid}" for pt, oid in sorted_items)
+        items_str = ", ".join(f"{str(pt)}: {oid}" for pt, oid in self.occupied())
         return f"HexGrid({{{items_str}}})"
 
-    _EVEN_ROW_OFFSETS = [Pt(-1, 0), Pt(1, 0), Pt(-1, -1), Pt(0, -1), Pt(-1, 1), Pt(0, 1)]
-    _ODD_ROW_OFFSETS = [Pt(-1, 0), Pt(1, 0), Pt(0, -1), Pt(1, -1), Pt(0, 1), Pt(1, 1)]
-
     def _to_cube(self, p: Pt) -> Tuple[int, int, int]:
         # Convert odd-r offset coordinates to cube coordinates
         # q = x - (y - (y&1)) / 2
@@ -72,9 +149,11 @@ class HexGrid:
         return (q, r, s)
 
     def distance(self, p1: Pt, p2: Pt) -> int:
-        q1, r1, s1 = self._to_cube(p1)
-        q2, r2, s2 = self._to_cube(p2)
-        return (abs(q1 - q2) + abs(r1 - r2) + abs(s1 - s2)) // 2
+        return hex_distance(p1.x, p1.y, p2.x, p2.y)
+
+    def within_one(self, p1: Pt, p2: Pt) -> bool:
+        """Cheaper equivalent of distance(p1, p2) <= 1."""
+        return hex_within_one(p1.x, p1.y, p2.x, p2.y)
 
     def __setitem__(self, pt: Pt, oid: int):
         if not isinstance(oid, int):
@@ -82,47 +161,62 @@ class HexGrid:
         if not self.is_in_bounds(pt):
             raise IndexError(f"Position {pt} is out of bounds (Width: {self.width}, Height: {self.height})")
         
+        idx = pt.y * self.width + pt.x
+
         # If position is occupied, remove the old object from reverse grid
-        if pt in self._grid:
-            del self[pt]
+        old_oid = self._cells[idx]
+        if old_oid is not None:
+            del self._reverse_grid[old_oid]
         
         # If object is already elsewhere, remove it from the old position in grid
         # This enforces 1-to-1 mapping for the object (an object can only be in one place)
-        if oid in self._reverse_grid:
-            old_pt = self._reverse_grid[oid]
-            if old_pt in self._grid:
-                del self[old_pt]
+        old_pt = self._reverse_grid.get(oid)
+        if old_pt is not None:
+            self._cells[old_pt.y * self.width + old_pt.x] = None
 
-        self._grid[pt] = oid
+        self._cells[idx] = oid
         self._reverse_grid[oid] = pt
 
     def __delitem__(self, pt: Pt):
-        if pt not in self._grid:
+        oid = self[pt]
+        if oid is None:
             raise KeyError(f"Position {pt} is empty")
         
-        oid = self._grid[pt]
         del self._reverse_grid[oid]
-        del self._grid[pt]
+        self._cells[pt.y * self.width + pt.x] = None
 
     def __getitem__(self, pt: Pt) -> Optional[int]:
         if not self.is_in_bounds(pt):
             return None
-        return self._grid.get(pt)
+        return self._cells[pt.y * self.width + pt.x]
+
+    def is_free(self, pt: Pt, oid: Optional[int] = None) -> bool:
+        """Returns True if pt is on the board and empty, or already holds oid."""
+        x, y = pt.x, pt.y
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        occupant = self._cells[y * self.width + x]
+        return occupant is None or occupant == oid
 
     def get_pt(self, oid: int) -> Pt:
-        if oid not in self._reverse_grid:
+        pt = self._reverse_grid.get(oid)
+        if pt is None:
             raise ValueError(f"Object {oid} not found in grid")
-        return self._reverse_grid[oid]
+        return pt
 
     def get_neighbors(self, pt: Pt) -> List[Pt]:
         neighbors = []
+        x, y = pt.x, pt.y
+        width, height = self.width, self.height
+        pts = self._pts
         
-        offsets = self._EVEN_ROW_OFFSETS if pt.y % 2 == 0 else self._ODD_ROW_OFFSETS
+        offsets = _ODD_ROW_OFFSETS if y & 1 else _EVEN_ROW_OFFSETS
             
-        for offset in offsets:
-            neighbor = pt.add(offset)
-            if self.is_in_bounds(neighbor):
-                neighbors.append(neighbor)
+        for dx, dy in offsets:
+            nx = x + dx
+            ny = y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbors.append(pts[ny * width + nx])
                 
         return neighbors
 
@@ -135,85 +229,89 @@ class HexGrid:
         if start == goal:
             return [start]
         
-        # Goal must be unoccupied
-        if goal in self._grid:
+        # Goal must be on the board and unoccupied
+        if not self.is_in_bounds(goal) or self[goal] is not None:
             return None
         
-        return self._find_path_internal(start, lambda pt: pt == goal)
+        return self._find_path_internal(start, {goal.y * self.width + goal.x})
     
     def find_path_adj(self, start: Pt, goal: Pt) -> Optional[List[Pt]]:
         """Find the shortest path from start to a cell adjacent to goal.
         
         Returns a list of points from start to an adjacent cell of goal (inclusive),
-        or None if no path exists. The goal itself may be occupied.
+        or None if no path exists. The goal itself may be occupied, but the path
+        only ends on a free cell next to it.
         """
         if start == goal:
             return [start]
         
-        goal_neighbors = set(self.get_neighbors(goal))
+        width = self.width
+        if self.is_in_bounds(goal):
+            goal_neighbors = self._adj[goal.y * width + goal.x]
+        else:
+            goal_neighbors = [pt.y * width + pt.x for pt in self.get_neighbors(goal)]
 
         # Check if start is already adjacent to goal
-        if start in goal_neighbors:
+        if start.y * width + start.x in goal_neighbors:
             return [start]
         
-        # Find path to any neighbor of goal
-        return self._find_path_internal(start, lambda pt: pt in goal_neighbors)
+        # Find path to any free neighbor of goal
+        cells = self._cells
+        free_neighbors = {idx for idx in goal_neighbors if cells[idx] is None}
+        if not free_neighbors:
+            return None
+        return self._find_path_internal(start, free_neighbors)
     
-    def _find_path_internal(self, start: Pt, is_goal) -> Optional[List[Pt]]:
-        """Internal A* pathfinding implementation.
+    def _find_path_internal(self, start: Pt, goals: Set[int]) -> Optional[List[Pt]]:
+        """Internal breadth-first pathfinding implementation.
+
+        Every step costs 1, so a plain BFS finds shortest paths; cells are expanded
+        in order of distance, ties in discovery order. Works on packed cell indices
+        (y * width + x) rather than Pt objects, so the search itself never touches
+        Pt objects; only the returned path does.
         
         Args:
             start: Starting position
-            is_goal: Function that returns True if a position satisfies the goal condition
+            goals: Free cell indices that satisfy the goal condition
             
         Returns:
             List of points from start to goal, or None if no path exists
         """
-        # Priority queue for A*: (f_score, count, current_node)
-        # We use a counter to break ties so Pt doesn't need to be comparable
-        count = 0
-        open_set = [(0, count, start)]
-        came_from: Dict[Pt, Pt] = {}
-        
-        g_score: Dict[Pt, int] = {start: 0}
-        
-        open_set_hash = {start} # To check membership in O(1)
-        
-        while open_set:
-            current = heapq.heappop(open_set)[2]
-            open_set_hash.discard(current)
+        cells = self._cells
+        adj = self._adj
+        start_idx = start.y * self.width + start.x
+
+        came_from: Dict[int, int] = {start_idx: -1}
+        queue = [start_idx]
+        i = 0
+        while i < len(queue):
+            current = queue[i]
+            i += 1
             
-            if is_goal(current):
+            if current in goals:
                 return self._reconstruct_path(came_from, current)
-            
-            for neighbor in self.get_neighbors(current):
-                # Check if neighbor is occupied (obstacle)
-                # We allow moving through the goal if it satisfies is_goal
-                if neighbor in self._grid and not is_goal(neighbor):
+
+            for neighbor in adj[current]:
+                # Skip visited and occupied (obstacle) cells
+                if neighbor in came_from or cells[neighbor] is not None:
                     continue
-                
-                tentative_g_score = g_score[current] + 1 # cost is always 1
-                
-                if tentative_g_score < g_score.get(neighbor, float('inf')):
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    # For heuristic, we can't use a single goal point, so use 0
-                    # This makes it Dijkstra's algorithm instead of A*
-                    f = tentative_g_score
-                    
-                    if neighbor not in open_set_hash:
-                        count += 1
-                        heapq.heappush(open_set, (f, count, neighbor))
-                        open_set_hash.add(neighbor)
+                came_from[neighbor] = current
+                queue.append(neighbor)
                         
         return None
 
-    def _reconstruct_path(self, came_from: Dict[Pt, Pt], current: Pt) -> List[Pt]:
+    def path_tree(self, start: Pt) -> 'PathTree':
+        """Builds a PathTree from start, for answering many find_path_adj queries at once."""
+        return PathTree(self, start)
+
+    def _reconstruct_path(self, came_from: Dict[int, int], current: int) -> List[Pt]:
+        pts = self._pts
         total_path = [current]
-        while current in came_from:
-            current = came_from[current]
+        current = came_from[current]
+        while current >= 0:
             total_path.append(current)
-        return total_path[::-1]
+            current = came_from[current]
+        return [pts[idx] for idx in reversed(total_path)]
 
     def move(self, oid: int, goal: Pt, dist: int) -> bool:
         """Move object oid towards goal, up to dist cells.
@@ -297,3 +395,74 @@ class HexGrid:
         self[new_pos] = oid
         
         return True
+
+class PathTree:
+    """Breadth-first shortest-path tree from a single start cell.
+
+    One flood of the board answers find_path_adj for any number of goals, e.g. one
+    per enemy during move generation. Only free cells are reached, so every path
+    ends on a free cell, as find_path_adj requires. Ties are broken in discovery
+    order, as in _find_path_internal, so paths are identical.
+
+    The tree reflects the grid at construction time and is not updated afterwards.
+    """
+    __slots__ = ('_grid', 'start', '_start_idx', '_rank', '_parent')
+
+    def __init__(self, grid: HexGrid, start: Pt):
+        self._grid = grid
+        self.start = start
+        cells = grid._cells
+        adj = grid._adj
+        start_idx = start.y * grid.width + start.x
+        self._start_idx = start_idx
+
+        # rank[idx] is the discovery order of a cell (-1 if unreachable or occupied);
+        # since this is a BFS it also orders cells by distance from start.
+        rank = [-1] * len(cells)
+        parent = [-1] * len(cells)
+        rank[start_idx] = 0
+        queue = [start_idx]
+        i = 0
+        while i < len(queue):
+            current = queue[i]
+            i += 1
+            for neighbor in adj[current]:
+                if rank[neighbor] < 0 and cells[neighbor] is None:
+                    rank[neighbor] = len(queue)
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+        self._rank = rank
+        self._parent = parent
+
+    def path_adj(self, goal: Pt) -> Optional[List[Pt]]:
+        """Same result as grid.find_path_adj(start, goal), read from the tree."""
+        start = self.start
+        if start == goal:
+            return [start]
+
+        grid = self._grid
+        width = grid.width
+        if grid.is_in_bounds(goal):
+            candidates = grid._adj[goal.y * width + goal.x]
+        else:
+            candidates = [pt.y * width + pt.x for pt in grid.get_neighbors(goal)]
+
+        start_idx = self._start_idx
+        if start_idx in candidates:
+            return [start]
+
+        rank = self._rank
+        best = -1
+        for idx in candidates:
+            if rank[idx] >= 0 and (best < 0 or rank[idx] < rank[best]):
+                best = idx
+        if best < 0:
+            return None
+
+        parent = self._parent
+        path = [best]
+        while best != start_idx:
+            best = parent[best]
+            path.append(best)
+        pts = grid._pts
+        return [pts[idx] for idx in reversed(path)]
@@ -1,4 +1,5 @@
-from typing import Protocol, List, TypeVar, Optional, Callable, Tuple, Dict
+from enum import Enum, auto
+from typing import Protocol, Iterable, List, TypeVar, Optional, Callable, Tuple, Dict
 
 # Generic type for a move
 GameMove = TypeVar('GameMove')
@@ -15,13 +16,15 @@ class GameState(Protocol):
         """Returns a list of possible moves for the current player."""
         ...
 
-    def apply(self, move: GameMove) -> List[Tuple['GameState', float]]:
+    def apply(self, move: GameMove) -> Iterable[Tuple['GameState', float]]:
         """
-        Returns a list of possible resulting GameStates with their probabilities.
+        Returns the possible resulting GameStates with their probabilities.
         Each tuple is (resulting_state, probability).
         Probabilities should sum to 1.0.
         
         For deterministic games, return [(new_state, 1.0)].
+        The solver finishes with each resulting state before taking the next one,
+        so a generator may reuse one state object for every outcome.
         """
         ...
     
@@ -29,6 +32,12 @@ class GameState(Protocol):
         """Returns a hash of the game state for the transposition table."""
         ...
 
+class Bound(Enum):
+    """How a transposition table score relates to the node's true value."""
+    EXACT = auto()  # Searched inside the alpha-beta window
+    LOWER = auto()  # Failed high: the true value is at least the score
+    UPPER = auto()  # Failed low: the true value is at most the score
+
 class MinimaxSolver:
     """
     A solver for games using Minimax/Expectimax algorithm with Alpha-Beta pruning
@@ -40,7 +49,8 @@ class MinimaxSolver:
             heuristic_evaluate: A function that evaluates a state (-1M to +1M).
         """
         self.heuristic_evaluate = heuristic_evaluate
-        self.transposition_table: Dict[Tuple[GameState, int, bool], float] = {}
+        # (hash(state), depth, is_maximizing) -> (bound, score, best_move)
+        self.transposition_table: Dict[Tuple[int, int, bool], Tuple[Bound, float, Optional[GameMove]]] = {}
 
     def solve(
         self,
@@ -73,20 +83,33 @@ class MinimaxSolver:
         Internal recursive method implementing Expectimax with Alpha-Beta pruning.
         Handles probabilistic outcomes from apply().
         """
-        tt_key = (state, depth, is_maximizing)
-        if tt_key in self.transposition_table:
-            return self.transposition_table[tt_key], None
+        tt_key = (hash(state), depth, is_maximizing)
+        entry = self.transposition_table.get(tt_key)
+        tt_move: Optional[GameMove] = None
+        if entry is not None:
+            bound, score, tt_move = entry
+            if (bound is Bound.EXACT
+                    or (bound is Bound.LOWER and score >= beta)
+                    or (bound is Bound.UPPER and score <= alpha)):
+                return score, tt_move
 
         if depth == 0 or state.is_over():
             score = float(self.heuristic_evaluate(state))
-            self.transposition_table[tt_key] = score
+            self.transposition_table[tt_key] = (Bound.EXACT, score, None)
             return score, None
 
+        alpha_orig, beta_orig = alpha, beta
         best_move: Optional[GameMove] = None
 
+        moves = state.get_possible_moves()
+        # Search the best move from an earlier visit first, for earlier cut-offs
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
         if is_maximizing:
             max_eval = -1_000_001.0
-            for move in state.get_possible_moves():
+            for move in moves:
                 # Get all possible outcomes with probabilities
                 outcomes = state.apply(move)
                 
@@ -104,11 +127,11 @@ class MinimaxSolver:
                 if beta <= alpha:
                     break  # Beta cut-off
             
-            self.transposition_table[tt_key] = max_eval
+            self._store(tt_key, max_eval, best_move, alpha_orig, beta_orig)
             return max_eval, best_move
         else:
             min_eval = 1_000_001.0
-            for move in state.get_possible_moves():
+            for move in moves:
                 # Get all possible outcomes with probabilities
                 outcomes = state.apply(move)
                 
@@ -126,5 +149,22 @@ class MinimaxSolver:
                 if beta <= alpha:
                     break  # Alpha cut-off
             
-            self.transposition_table[tt_key] = min_eval
+            self._store(tt_key, min_eval, best_move, alpha_orig, beta_orig)
             return min_eval, best_move
+
+    def _store(
+        self,
+        tt_key: Tuple[int, int, bool],
+        score: float,
+        best_move: Optional[GameMove],
+        alpha: float,
+        beta: float
+    ):
+        """Records a searched node, tagged with how its score relates to the (alpha, beta) window."""
+        if score <= alpha:
+            bound = Bound.UPPER
+        elif score >= beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        self.transposition_table[tt_key] = (bound, score, best_move)
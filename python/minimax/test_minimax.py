@@ -1,7 +1,7 @@
 import unittest
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Tuple
-from minimax.minimax import GameState, MinimaxSolver
+from minimax.minimax import Bound, GameState, MinimaxSolver
 
 @dataclass(frozen=True)
 class NimState:
@@ -70,16 +70,27 @@ class TestMinimax(unittest.TestCase):
         self.assertTrue(len(self.solver.transposition_table) > 0, "Transposition table should be populated")
         
         # Manually modify a value in TT to verify it's being used
-        key = (start_state, 10, True)
+        key = (hash(start_state), 10, True)
         self.assertIn(key, self.solver.transposition_table)
         
         # Poison the cache
-        self.solver.transposition_table[key] = 999999
+        self.solver.transposition_table[key] = (Bound.EXACT, 999999, None)
         
         # Second run: Should return poisoned value
         score2, _ = self.solver.solve(start_state, depth=10, is_maximizing=True)
         self.assertEqual(score2, 999999, "Should return value from transposition table")
 
+    def test_transposition_table_bound_outside_window(self):
+        start_state = NimState(tokens=4, is_max_player_turn=True)
+        key = (hash(start_state), 10, True)
+
+        # A lower bound that doesn't reach beta says nothing about the exact value
+        self.solver.transposition_table[key] = (Bound.LOWER, -999999, None)
+        score, move = self.solver.solve(start_state, depth=10, is_maximizing=True)
+        self.assertEqual(score, 1000)
+        self.assertEqual(move, 1)
+        self.assertEqual(self.solver.transposition_table[key], (Bound.EXACT, 1000, 1))
+
 @dataclass(frozen=True)
 class CoinFlipState:
     """A simple non-deterministic game where moves have probabilistic outcomes."""
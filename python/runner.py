@@ -1,21 +1,32 @@
+import logging
+import random
 import game_engine
 from minimax.minimax import MinimaxSolver
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
 
 class Runner:
-    def __init__(self, p1_units: List[str], p2_units: List[str], heuristic_func=None, depth: int = 2):
+    def __init__(self, p1_units: List[str], p2_units: List[str], heuristic_func=None, depth: int = 2,
+                 roll: Optional[game_engine.Roll] = None, rng: Optional[random.Random] = None):
         self.p1_units = p1_units
         self.p2_units = p2_units
         self.heuristic_func = heuristic_func if heuristic_func else game_engine.heuristic_evaluate
         self.depth = depth
+        self.roll = roll if roll else game_engine.BatchedRoll()
         
         self.config = game_engine.GameConfig()
         self.instance = game_engine.GameInstance(self.config)
-        self.game = self.instance.start_game(p1_units, p2_units)
+        self.game = self.instance.start_game(p1_units, p2_units, rng)
         self.solver = MinimaxSolver(self.heuristic_func)
 
-    def simulate(self):
-        self.game.print()
+    def simulate(self, verbose: bool = True) -> Optional[int]:
+        """Plays the game to completion and returns the winning player id.
+
+        Returns None if the game stalls on a unit that has no valid moves.
+        """
+        if verbose:
+            self.game.print()
 
         turn = 0
         while not self.game.is_over():
@@ -27,15 +38,42 @@ class Runner:
             # So P1 maximizes, P2 minimizes.
             is_maximizing = (current_unit.player_id == 1)
             
+            # Each turn searches from a new root, and few of the previous turn's
+            # entries are reachable from it; drop them to keep the table small.
+            self.solver.transposition_table.clear()
             score, move = self.solver.solve(self.game, self.depth, is_maximizing)
-            assert move is not None, "No valid moves found."
+            if move is None:
+                log.warning("No valid moves found for %s; stopping the game.", current_unit)
+                return None
 
-            print(f"\n--- Turn {turn}: {current_unit} ---")
-            print(f"Action: {move}")
-            self.game.execute_move(move, game_engine.Roll())
-            self.game.print()
+            if verbose:
+                print(f"\n--- Turn {turn}: {current_unit} ---")
+                print(f"Action: {move}")
+            self.game.execute_move(move, self.roll)
+            if verbose:
+                self.game.print()
+
+        return self.game.winner()
+
+def simulate_batch(p1_units: List[str], p2_units: List[str], num_games: int, heuristic_func=None,
+                   depth: int = 2, seed: Optional[int] = None) -> Dict[int, int]:
+    """Plays num_games silent games back to back and returns the win count per player.
+
+    Games that stall, with a unit left without valid moves, are counted under 0.
+    Turn orders and dice all come from one generator seeded with seed, so the same
+    seed replays the same batch.
+    """
+    rng = random.Random(seed)
+    roll = game_engine.BatchedRoll(rng.getrandbits(64))
+    wins = {0: 0, 1: 0, 2: 0}
+    for _ in range(num_games):
+        runner = Runner(p1_units, p2_units, heuristic_func=heuristic_func, depth=depth, roll=roll, rng=rng)
+        winner = runner.simulate(verbose=False)
+        wins[winner if winner is not None else 0] += 1
+    return wins
             
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     # Example usage
     runner = Runner(
         p1_units=["Warrior", "Mage"],
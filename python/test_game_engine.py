@@ -1,5 +1,9 @@
+import json
+import os
+import tempfile
 import unittest
-from hex import Pt, SquareGrid
+from game_engine import GameInstance, GameConfig, GameState, GameMove, MoveType, UnitType, Spell, FixedRoll, RollResult
+from hex import Pt, SquareGrid, HexGrid
 
 class TestPosition(unittest.TestCase):
     def setUp(self):
@@ -47,5 +51,202 @@ class TestPosition(unittest.TestCase):
         p2 = Pt(5, 2)
         self.assertEqual(self.grid.distance(p1, p2), 6)
 
+class TestGameConfig(unittest.TestCase):
+    def test_relative_path_follows_cwd(self):
+        with open("config.json") as f:
+            data = json.load(f)
+        default_width = GameConfig().grid_width
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            data['grid']['width'] = default_width + 1
+            with open(os.path.join(tmp, "config.json"), 'w') as f:
+                json.dump(data, f)
+            os.chdir(tmp)
+            try:
+                self.assertEqual(GameConfig().grid_width, default_width + 1)
+            finally:
+                os.chdir(cwd)
+
+    def test_configs_do_not_share_dicts(self):
+        config = GameConfig()
+        config.spells.clear()
+        config.unit_types.clear()
+        fresh = GameConfig()
+        self.assertTrue(fresh.spells)
+        self.assertTrue(fresh.unit_types)
+
+class TestGameState(unittest.TestCase):
+    def setUp(self):
+        self.config = GameConfig()
+        self.config.unit_types = {
+            "Warrior": UnitType("Warrior", health=100, ac=10, wc=0, attack_damage=10, speed=3, spells=[]),
+        }
+        self.instance = GameInstance(self.config)
+        self.instance.units = {1: self.config.unit_types["Warrior"], 2: self.config.unit_types["Warrior"]}
+        self.instance.turn_order = [1, 2]
+
+    def make_state(self, p1_pos: Pt, p2_pos: Pt) -> GameState:
+        grid = HexGrid(self.config.grid_width, self.config.grid_height)
+        grid[p1_pos] = 1
+        grid[p2_pos] = 2
+        return GameState(self.instance, grid)
+
+    def test_distance_follows_moves(self):
+        state = self.make_state(Pt(0, 0), Pt(0, 5))
+        self.assertEqual(state._distance(1, 2), 5)
+        self.assertEqual(state._distance(2, 1), 5)
+
+        state.execute_move(GameMove(MoveType.MOVE, target_pos=Pt(0, 3)), FixedRoll(RollResult.HIT))
+        self.assertEqual(state._distance(1, 2), 2)
+
+    def test_next_turn_skips_dead_units(self):
+        self.config.unit_types["Weakling"] = UnitType("Weakling", health=5, ac=10, wc=0, attack_damage=1, speed=1, spells=[])
+        self.instance.units = {
+            1: self.config.unit_types["Warrior"],
+            2: self.config.unit_types["Weakling"],
+            4: self.config.unit_types["Warrior"],
+        }
+        self.instance.turn_order = [1, 2, 4]
+        grid = HexGrid(self.config.grid_width, self.config.grid_height)
+        grid[Pt(0, 0)] = 1
+        grid[Pt(1, 0)] = 2
+        grid[Pt(5, 5)] = 4
+        state = GameState(self.instance, grid)
+
+        state.execute_move(GameMove(MoveType.ATTACK, target_pos=Pt(1, 0)), FixedRoll(RollResult.HIT))
+        self.assertFalse(state.units[2].is_alive)
+        self.assertEqual(state.get_current_unit().uid, 4)
+        self.assertFalse(state.is_over())
+
+        state.execute_move(GameMove(MoveType.MOVE, target_pos=Pt(5, 4)), FixedRoll(RollResult.HIT))
+        self.assertEqual(state.get_current_unit().uid, 1)
+
+    def test_is_over_after_last_enemy_dies(self):
+        state = self.make_state(Pt(0, 0), Pt(1, 0))
+        state.units[2].current_health = 5
+        self.assertFalse(state.is_over())
+        self.assertIsNone(state.winner())
+
+        state.execute_move(GameMove(MoveType.ATTACK, target_pos=Pt(1, 0)), FixedRoll(RollResult.HIT))
+        self.assertTrue(state.is_over())
+        self.assertEqual(state.winner(), 1)
+        self.assertIsNone(state.units[2].position)
+        # Clones keep their own counters
+        self.assertTrue(state.clone().is_over())
+
+    def test_undo_move_revives_unit(self):
+        state = self.make_state(Pt(0, 0), Pt(1, 0))
+        state.units[2].current_health = 5
+        before = hash(state)
+
+        record = state.make_move(GameMove(MoveType.ATTACK, target_pos=Pt(1, 0)), FixedRoll(RollResult.HIT))
+        self.assertTrue(state.is_over())
+        state.undo_move(record)
+
+        self.assertEqual(hash(state), before)
+        self.assertFalse(state.is_over())
+        self.assertEqual(state.grid[Pt(1, 0)], 2)
+        self.assertEqual(state.units[2].position, Pt(1, 0))
+        # The revived unit is back in the turn ring
+        state._next_turn()
+        self.assertEqual(state.get_current_unit().uid, 2)
+
+    def test_apply_restores_state(self):
+        state = self.make_state(Pt(0, 0), Pt(0, 5))
+        before = hash(state)
+        for move in state.get_possible_moves():
+            outcomes = [(hash(s), prob) for s, prob in state.apply(move)]
+            self.assertTrue(outcomes)
+            self.assertEqual(hash(state), before)
+
+    def test_possible_moves_reused_after_undo(self):
+        state = self.make_state(Pt(0, 0), Pt(0, 5))
+        moves = state.get_possible_moves()
+        moves.reverse()
+        record = state.make_move(GameMove(MoveType.MOVE, target_pos=Pt(0, 2)), FixedRoll(RollResult.HIT))
+        self.assertNotIn(GameMove(MoveType.MOVE, target_pos=Pt(0, 2)), state.get_possible_moves())
+        state.undo_move(record)
+        cached = len(state._move_cache)
+        # Back at the same position: the same GameMove objects, in their original order
+        again = state.get_possible_moves()
+        self.assertEqual(len(state._move_cache), cached)
+        self.assertEqual(len(again), len(moves))
+        for move, original in zip(again, reversed(moves)):
+            self.assertIs(move, original)
+
+    def test_apply_closed_early_restores_state(self):
+        state = self.make_state(Pt(0, 0), Pt(1, 0))
+        before = hash(state)
+        for move in (GameMove(MoveType.MOVE, target_pos=Pt(0, 2)),
+                     GameMove(MoveType.ATTACK, target_pos=Pt(1, 0))):
+            outcomes = state.apply(move)
+            next(outcomes)
+            outcomes.close()
+            self.assertEqual(hash(state), before)
+            self.assertEqual(state.units[1].position, Pt(0, 0))
+            self.assertEqual(state.units[2].position, Pt(1, 0))
+            self.assertEqual(state.get_current_unit().uid, 1)
+
+    def test_hash_matches_fresh_state(self):
+        state = self.make_state(Pt(0, 0), Pt(0, 5))
+        state.execute_move(GameMove(MoveType.MOVE, target_pos=Pt(0, 2)), FixedRoll(RollResult.HIT))
+        state.execute_move(GameMove(MoveType.MOVE, target_pos=Pt(0, 3)), FixedRoll(RollResult.HIT))
+        state.execute_move(GameMove(MoveType.ATTACK, target_pos=Pt(0, 3)), FixedRoll(RollResult.HIT))
+
+        # Same cells, health and turn as a freshly built state, whatever the path there
+        fresh = self.make_state(Pt(0, 2), Pt(0, 3))
+        fresh._next_turn()
+        fresh.execute_move(GameMove(MoveType.ATTACK, target_pos=Pt(0, 2)), FixedRoll(RollResult.MISS))
+        fresh.execute_move(GameMove(MoveType.ATTACK, target_pos=Pt(0, 3)), FixedRoll(RollResult.HIT))
+        self.assertEqual(hash(state), hash(fresh))
+        self.assertNotEqual(hash(state), hash(self.make_state(Pt(0, 2), Pt(0, 3))))
+
+    def test_spell_targets_limited_to_range(self):
+        self.config.spells = {"Spark": Spell("Spark", damage=5, range=1)}
+        self.config.spell_range_slack = 1
+        self.instance.units[1] = UnitType("Caster", health=50, ac=10, wc=0, attack_damage=1, speed=1, spells=["Spark"])
+
+        def spell_targets(state):
+            return [m.target_pos for m in state.get_possible_moves() if m.move_type == MoveType.CAST_SPELL]
+
+        self.assertEqual(spell_targets(self.make_state(Pt(0, 0), Pt(0, 2))), [Pt(0, 2)])
+        self.assertEqual(spell_targets(self.make_state(Pt(0, 0), Pt(0, 3))), [])
+
+    def test_charge_lands_on_free_cell(self):
+        # The ally at (1, 0) holds the first cell next to the enemy at (2, 0);
+        # the charge lands on the free (1, 1) instead
+        self.instance.units[3] = self.config.unit_types["Warrior"]
+        self.instance.turn_order = [1, 2, 3]
+        grid = HexGrid(self.config.grid_width, self.config.grid_height)
+        grid[Pt(0, 0)] = 1
+        grid[Pt(2, 0)] = 2
+        grid[Pt(1, 0)] = 3
+        state = GameState(self.instance, grid)
+
+        moves = state.get_possible_moves()
+        self.assertIn(GameMove(MoveType.CHARGE, target_pos=Pt(2, 0)), moves)
+        for move in moves:
+            self.assertTrue(list(state.apply(move)))
+        state.execute_move(GameMove(MoveType.CHARGE, target_pos=Pt(2, 0)), FixedRoll(RollResult.MISS))
+        self.assertEqual(state.units[1].position, Pt(1, 1))
+
+    def test_move_towards_enemy_past_allies(self):
+        # The ally at (2, 5) holds the cell next to the enemy at (2, 4) that is
+        # closest to the mover; (3, 4) and (1, 5) are still free, 2 steps away
+        self.instance.units[3] = self.config.unit_types["Warrior"]
+        self.instance.units[5] = self.config.unit_types["Warrior"]
+        self.instance.turn_order = [1, 2, 3, 5]
+        grid = HexGrid(self.config.grid_width, self.config.grid_height)
+        grid[Pt(3, 6)] = 1
+        grid[Pt(2, 4)] = 2
+        grid[Pt(2, 5)] = 3
+        grid[Pt(2, 3)] = 5
+        state = GameState(self.instance, grid)
+
+        moves = state.get_possible_moves()
+        self.assertIn(GameMove(MoveType.MOVE, target_pos=Pt(1, 5)), moves)
+        for move in moves:
+            self.assertTrue(list(state.apply(move)))
+
 if __name__ == '__main__':
     unittest.main()
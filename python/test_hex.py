@@ -1,6 +1,6 @@
 import unittest
 import unittest
-from hex import HexGrid, Pt
+from hex import HexGrid, Pt, hex_distance, hex_within_one
 
 class TestHexGrid(unittest.TestCase):
     def setUp(self):
@@ -105,6 +105,24 @@ class TestHexGrid(unittest.TestCase):
         self.assertEqual(self.grid.distance(Pt(0, 6), Pt(6, 6)), 6)
         self.assertEqual(self.grid.distance(Pt(0, 0), Pt(6, 6)), 9)
 
+    def test_hex_distance_matches_cube_distance(self):
+        grid = HexGrid(6, 6)
+        for a in range(36):
+            p1 = Pt(a % 6, a // 6)
+            q1, r1, s1 = grid._to_cube(p1)
+            for b in range(36):
+                p2 = Pt(b % 6, b // 6)
+                q2, r2, s2 = grid._to_cube(p2)
+                expected = (abs(q1 - q2) + abs(r1 - r2) + abs(s1 - s2)) // 2
+                self.assertEqual(hex_distance(p1.x, p1.y, p2.x, p2.y), expected)
+
+    def test_hex_within_one_matches_distance(self):
+        for a in range(36):
+            x1, y1 = a % 6, a // 6
+            for b in range(36):
+                x2, y2 = b % 6, b // 6
+                self.assertEqual(hex_within_one(x1, y1, x2, y2), hex_distance(x1, y1, x2, y2) <= 1)
+
     def test_distance_same_point(self):
         p = Pt(3, 3)
         self.assertEqual(self.grid.distance(p, p), 0)
@@ -151,6 +169,10 @@ class TestHexGrid(unittest.TestCase):
         self.assertIsNotNone(path)
         self.assertEqual(path, [Pt(0, 0), Pt(0, 1), Pt(0, 2)])
         
+        # Off-board goals have no path
+        self.assertIsNone(self.grid.find_path(start, Pt(5, 0)))
+        self.assertIsNone(self.grid.find_path(start, Pt(-1, 1)))
+        
         # Obstacle
         # Block (0,1). Path should go around.
         # (0,0) neighbors: (1,0), (0,1)[Blocked]
@@ -215,6 +237,14 @@ class TestHexGrid(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.grid.get_pt(obj2)
             
+    def test_is_free(self):
+        self.grid[Pt(1, 1)] = 7
+        self.assertTrue(self.grid.is_free(Pt(0, 0)))
+        self.assertFalse(self.grid.is_free(Pt(1, 1)))
+        self.assertTrue(self.grid.is_free(Pt(1, 1), 7))
+        self.assertFalse(self.grid.is_free(Pt(-1, 0)))
+        self.assertFalse(self.grid.is_free(Pt(5, 0)))
+
     def test_type_error(self):
         p = Pt(0, 0)
         with self.assertRaises(TypeError):
@@ -262,6 +292,11 @@ class TestHexGrid(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(grid2.get_pt(10), Pt(2, 2))  # Didn't move
         
+        # Off-board goal: no move
+        result = self.grid.move(oid, Pt(5, 0), 10)
+        self.assertFalse(result)
+        self.assertEqual(self.grid.get_pt(oid), Pt(3, 3))
+        
         # Test with invalid oid
         with self.assertRaises(ValueError):
             self.grid.move(999, Pt(1, 1), 1)
@@ -309,7 +344,7 @@ class TestHexGrid(unittest.TestCase):
             obstacle_id += 1
             # Also surround each neighbor
             for n2 in grid2.get_neighbors(neighbor):
-                if n2 not in grid2._grid:
+                if grid2[n2] is None:
                     grid2[n2] = obstacle_id
                     obstacle_id += 1
         
@@ -317,6 +352,18 @@ class TestHexGrid(unittest.TestCase):
         path = grid2.find_path_adj(Pt(0, 0), Pt(2, 2))
         self.assertIsNone(path)
     
+    def test_path_tree_matches_find_path_adj(self):
+        grid = HexGrid(7, 7)
+        for oid, pt in enumerate([Pt(1, 1), Pt(2, 2), Pt(3, 1), Pt(4, 4), Pt(5, 2), Pt(2, 5)]):
+            grid[pt] = oid + 10
+        start = Pt(0, 0)
+        grid[start] = 1
+        tree = grid.path_tree(start)
+        for y in range(7):
+            for x in range(7):
+                goal = Pt(x, y)
+                self.assertEqual(tree.path_adj(goal), grid.find_path_adj(start, goal), f"goal {goal}")
+
     def test_move_adj(self):
         # Test moving towards an occupied goal
         self.grid[Pt(0, 0)] = 1
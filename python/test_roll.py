@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch
-from game_engine import Roll, FixedRoll, RollResult
+from game_engine import Roll, FixedRoll, BatchedRoll, RollResult
 
 class TestRoll(unittest.TestCase):
     def test_crit(self):
@@ -66,6 +66,33 @@ class TestRoll(unittest.TestCase):
             self.assertEqual(res, RollResult.HIT)
             self.assertAlmostEqual(roll.last_probability, 0.9)
 
+    def test_seeded_rolls_repeat(self):
+        a = Roll(seed=7)
+        b = Roll(seed=7)
+        results = [a.roll(bonus=0, difficulty=10) for _ in range(50)]
+        self.assertEqual(results, [b.roll(bonus=0, difficulty=10) for _ in range(50)])
+
+class TestBatchedRoll(unittest.TestCase):
+    def test_seeded_rolls_are_reproducible(self):
+        a = BatchedRoll(seed=42)
+        b = BatchedRoll(seed=42)
+        rolls_a = [a._d20() for _ in range(100)]
+        rolls_b = [b._d20() for _ in range(100)]
+        self.assertEqual(rolls_a, rolls_b)
+        self.assertTrue(all(1 <= r <= 20 for r in rolls_a))
+
+    def test_pool_refills_when_exhausted(self):
+        roll = BatchedRoll(seed=0)
+        rolls = [roll._d20() for _ in range(BatchedRoll.POOL_SIZE + 10)]
+        self.assertEqual(len(rolls), BatchedRoll.POOL_SIZE + 10)
+        self.assertEqual(roll._pool_idx, 10)
+
+    def test_roll_uses_pool(self):
+        roll = BatchedRoll(seed=0)
+        roll._pool[0] = 20
+        self.assertEqual(roll.roll(bonus=0, difficulty=10), RollResult.CRIT)
+        self.assertEqual(roll.last_probability, 0.05)
+
 class TestFixedRoll(unittest.TestCase):
     def test_fixed_hit(self):
         fixed = FixedRoll(RollResult.HIT)
@@ -0,0 +1,13 @@
+import unittest
+from runner import simulate_batch
+
+class TestSimulateBatch(unittest.TestCase):
+    def test_same_seed_same_wins(self):
+        units = ["Warrior", "Mage", "Battlemage"]
+        first = simulate_batch(units, units, 10, seed=5, depth=1)
+        self.assertEqual(sum(first.values()), 10)
+        for _ in range(2):
+            self.assertEqual(simulate_batch(units, units, 10, seed=5, depth=1), first)
+
+if __name__ == '__main__':
+    unittest.main()